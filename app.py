@@ -2,11 +2,13 @@
 """Entry point of the application
     """
 
-from sys import exit
+import os
+from contextlib import redirect_stdout
+from sys import exit, stderr, stdout
 from utils import compare_aligned_sequences, spreadsheet_utils, arg_parse
 
 
-def run(protein_alignments_path, extension, output_file_name) -> None:
+def run(protein_alignments_path, extension, output_file_name, top_n=20) -> None:
     """Run the functions in the order needed based on user
     input
 
@@ -14,13 +16,76 @@ def run(protein_alignments_path, extension, output_file_name) -> None:
         protein_alignments_path (str): path to the protein alignments file
         extension (str): extension of the protein alignments file
         output_file_name (str): name of the output file
+        top_n (int): number of most frequent mutations in the summary
     @return: None
     """
     print("\nCreating new workbook...")
     workbook, sheet = spreadsheet_utils.create_workbook()
     print("Workbook created!")
 
-    print("\nExtracting protein names as header columns...")
+    mutation_finder = _find_mutations(protein_alignments_path, extension, sheet)
+    print("Inserting headers and Isolate IDs to excel...")
+    mutation_finder.insert_ids_to_excel()
+    print("Inserting data to excel sheet...")
+    mutation_finder.insert_to_excel()
+    print("Inserting summary statistics to excel...")
+    summary_frames = mutation_finder.summary_frames(top_n)
+    for title, frame in summary_frames.items():
+        spreadsheet_utils.insert_dataframe_to_sheet(workbook, title, frame)
+
+    # Save to spreadsheet
+    spreadsheet_utils.save_worksheet(workbook, output_file_name + ".xlsx")
+    # Save spreadsheet to csv
+    spreadsheet_utils.excel_to_csv(output_file_name + ".xlsx", "Sheet")
+    for title, frame in summary_frames.items():
+        spreadsheet_utils.dataframe_to_csv(frame, output_file_name, title)
+    print("\nExiting...")
+    exit(0)
+
+
+def stream(protein_alignments_path, extension, jsonl_file_name) -> None:
+    """Compare the alignments and emit one JSON line per isolate and protein
+    as soon as it is compared, without building the workbook.
+    When streaming to stdout, progress messages are written to stderr so
+    that they do not get mixed with the results, and a consumer closing the
+    pipe early ends the run quietly.
+
+    Args:
+        protein_alignments_path (str): path to the protein alignments file
+        extension (str): extension of the protein alignments file
+        jsonl_file_name (str): name of the JSON Lines output file, "-" for stdout
+    @return: None
+    """
+    if jsonl_file_name == "-":
+        try:
+            with redirect_stdout(stderr):
+                _find_mutations(protein_alignments_path, extension, stream=stdout)
+        except BrokenPipeError:
+            # Python flushes stdout at exit, so point it at devnull to
+            # avoid another BrokenPipeError once the consumer is gone
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, stdout.fileno())
+            exit(1)
+        print("\nExiting...", file=stderr)
+    else:
+        with open(jsonl_file_name, "w", encoding="utf-8") as jsonl_file:
+            _find_mutations(protein_alignments_path, extension, stream=jsonl_file)
+        print("\nExiting...")
+    exit(0)
+
+
+def _find_mutations(protein_alignments_path, extension, sheet=None, stream=None):
+    """Extract the protein names and compare their alignments for mutations.
+    Shared by run() and stream() so both process the alignments the same way.
+
+    Args:
+        protein_alignments_path (str): path to the protein alignments file
+        extension (str): extension of the protein alignments file
+        sheet (Workbook child): sheet to later insert the mutations to, None when streaming
+        stream (TextIO): stream to write each result to as a JSON line, None for the sheet
+    @return: MultiFastaMutationsFinder
+    """
+    print("\nExtracting protein names...")
     protein_names = spreadsheet_utils.extract_gene_name_from_file(protein_alignments_path)
 
     mutation_finder = (
@@ -29,26 +94,20 @@ def run(protein_alignments_path, extension, output_file_name) -> None:
                 sheet,
                 protein_names,
                 extension,
+                stream=stream,
             )
     )
 
     print("Processing Multi Fasta Alignment file...")
     mutation_finder.process_fasta_file()
-    print("Inserting headers and Isolate IDs to excel...")
-    mutation_finder.insert_ids_to_excel()
-    print("Inserting data to excel sheet...")
-    mutation_finder.insert_to_excel()
-
-    # Save to spreadsheet
-    spreadsheet_utils.save_worksheet(workbook, output_file_name + ".xlsx")
-    # Save spreadsheet to csv
-    spreadsheet_utils.excel_to_csv(output_file_name + ".xlsx", "Sheet")
-    print("\nExiting...")
-    exit(0)
+    return mutation_finder
 
 
 if __name__ == "__main__":
     parser = arg_parse.argparser()
     args = parser.parse_args()
 
-    run(args.protein_alignment_dir, args.extension, args.output_excel_file)
+    if args.jsonl_output:
+        stream(args.protein_alignment_dir, args.extension, args.jsonl_output)
+    else:
+        run(args.protein_alignment_dir, args.extension, args.output_excel_file, args.top_n)
@@ -0,0 +1,100 @@
+"""Check the JSON Lines results streamed by the mutation finder
+    and by the application's stream mode.
+    """
+
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from utils import compare_aligned_sequences
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+ALIGNMENTS = {
+    "rpoB": ">H37Rv\nMSTVAL\n>iso1\nMSTVAL\n>iso2\nMPTXL-\n>iso3\nMPTV\n",
+    "katG": ">iso1\nMKA\n>CDC1551\nMKA\n>iso4\nMRA\n",
+}
+
+EXPECTED = [
+    {"isolate_id": "iso1", "protein": "katG", "mutations": []},
+    {"isolate_id": "iso4", "protein": "katG", "mutations": ["K2R"]},
+    {"isolate_id": "iso1", "protein": "rpoB", "mutations": []},
+    {"isolate_id": "iso2", "protein": "rpoB", "mutations": ["S2P", "A5L", "L6-"]},
+    {"isolate_id": "iso3", "protein": "rpoB", "mutations": ["S2P"]},
+]
+
+
+@pytest.fixture
+def alignment_dir(tmp_path):
+    for protein, alignment in ALIGNMENTS.items():
+        (tmp_path / f"{protein}.mfa").write_text(alignment, encoding="utf-8")
+    return tmp_path
+
+
+def test_finder_streams_json_lines(alignment_dir):
+    stream = io.StringIO()
+    mutation_finder = compare_aligned_sequences.MultiFastaMutationsFinder(
+        str(alignment_dir),
+        None,
+        sorted(ALIGNMENTS),
+        ".mfa",
+        stream=stream,
+    )
+    mutation_finder.process_fasta_file()
+
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == EXPECTED
+    # Nothing is kept for the Excel sheet or the summary statistics
+    assert not mutation_finder.id_mutations
+    assert mutation_finder.protein_stats == []
+    assert mutation_finder.mutation_counts == []
+
+
+def run_app(*args, **kwargs):
+    return subprocess.run(
+        [sys.executable, APP, *args], capture_output=True, text=True, check=False, **kwargs
+    )
+
+
+def test_stream_to_stdout(alignment_dir):
+    result = run_app("-p", str(alignment_dir), "-j", "-")
+
+    assert result.returncode == 0
+    # Progress messages go to stderr, leaving only the results on stdout
+    assert sorted(map(json.loads, result.stdout.splitlines()), key=lambda r: (r["protein"], r["isolate_id"])) == EXPECTED
+    assert "Processing Multi Fasta Alignment file..." in result.stderr
+
+
+def test_stream_to_file(alignment_dir, tmp_path):
+    jsonl_file = tmp_path / "results.jsonl"
+    result = run_app("-p", str(alignment_dir), "-j", str(jsonl_file))
+
+    assert result.returncode == 0
+    assert "Processing Multi Fasta Alignment file..." in result.stdout
+    with open(jsonl_file, encoding="utf-8") as handle:
+        results = [json.loads(line) for line in handle]
+    assert sorted(results, key=lambda r: (r["protein"], r["isolate_id"])) == EXPECTED
+
+
+def test_stream_to_closed_pipe(tmp_path):
+    ref = "MSTVAL" * 50
+    isolates = "".join(f">iso{i}\nMP{ref[2:]}\n" for i in range(5000))
+    (tmp_path / "rpoB.mfa").write_text(f">H37Rv\n{ref}\n{isolates}", encoding="utf-8")
+
+    process = subprocess.Popen(
+        [sys.executable, APP, "-p", str(tmp_path), "-j", "-"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    # The consumer reads a single result and goes away
+    assert json.loads(process.stdout.readline())["mutations"] == ["S2P"]
+    process.stdout.close()
+    stderr = process.stderr.read()
+    process.wait()
+
+    assert process.returncode == 1
+    assert "Traceback" not in stderr
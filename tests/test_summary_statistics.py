@@ -0,0 +1,146 @@
+"""Check that the vectorized summary statistics agree with the mutations
+    written to the sheet by compare_aligned_sequences.
+    """
+
+from collections import Counter
+
+import pytest
+
+from utils import compare_aligned_sequences, spreadsheet_utils
+
+ALIGNMENTS = {
+    # Missing positions ("X"), gaps ("-") and a shorter isolate
+    "rpoB": ">H37Rv\nMSTVAL\n>iso1\nMSTVAL\n>iso2\nMPTXL-\n>iso3\nMPTV\n>iso4\nXXXXXX\n",
+    # Only wild-type isolates
+    "katG": ">iso1\nMKA\n>H37Rv\nMKA\n>iso5\nMKA\n",
+}
+
+
+def find_mutations(tmp_path, alignments, top_n=20):
+    for protein, alignment in alignments.items():
+        (tmp_path / f"{protein}.mfa").write_text(alignment, encoding="utf-8")
+
+    _, sheet = spreadsheet_utils.create_workbook()
+    mutation_finder = compare_aligned_sequences.MultiFastaMutationsFinder(
+        str(tmp_path),
+        sheet,
+        sorted(alignments),
+        ".mfa",
+    )
+    mutation_finder.process_fasta_file()
+    mutation_finder.insert_ids_to_excel()
+    mutation_finder.insert_to_excel()
+    return mutation_finder, sheet
+
+
+def sheet_mutations(sheet):
+    """Parse the sheet back into a dictionary of protein to per-isolate mutation lists"""
+    rows = list(sheet.iter_rows(values_only=True))
+    proteins = rows[0][1:]
+    mutations = {protein: [] for protein in proteins}
+    for row in rows[1:]:
+        for protein, cell in zip(proteins, row[1:]):
+            mutations[protein].append([] if cell == "X" else cell.split(";"))
+    return mutations
+
+
+def test_summary_matches_sheet(tmp_path):
+    mutation_finder, sheet = find_mutations(tmp_path, ALIGNMENTS)
+    frames = mutation_finder.summary_frames()
+    parsed = sheet_mutations(sheet)
+
+    protein_summary = frames["Protein Summary"].set_index("Protein")
+    for protein, isolate_mutations in parsed.items():
+        isolates = len(mutation_finder.id_mutations[protein])
+        mutated = sum(1 for mutations in isolate_mutations if mutations)
+        assert protein_summary.loc[protein, "Isolates"] == isolates
+        assert protein_summary.loc[protein, "Mutated Isolates"] == mutated
+        assert protein_summary.loc[protein, "Wild-type Isolates"] == isolates - mutated
+        assert protein_summary.loc[protein, "Wild-type Share"] == pytest.approx((isolates - mutated) / isolates)
+
+    expected = Counter(
+        (protein, mutation)
+        for protein, isolate_mutations in parsed.items()
+        for mutations in isolate_mutations
+        for mutation in mutations
+    )
+    top_mutations = frames["Top Mutations"]
+    assert Counter(dict(zip(zip(top_mutations["Protein"], top_mutations["Mutation"]), top_mutations["Count"]))) == expected
+
+    position_counts = frames["Position Counts"].melt(
+        id_vars=["Protein", "Position", "Reference"], var_name="Alt", value_name="Count"
+    )
+    position_counts = position_counts[position_counts["Count"] > 0]
+    assert Counter({
+        (row.Protein, f"{row.Reference}{row.Position}{row.Alt}"): row.Count
+        for row in position_counts.itertuples()
+    }) == expected
+
+
+def test_position_frequencies(tmp_path):
+    mutation_finder, _ = find_mutations(tmp_path, ALIGNMENTS)
+    frames = mutation_finder.summary_frames()
+
+    # rpoB has 4 isolates: S2P in two of them, A5L and L6- in one
+    assert frames["Position Counts"].to_dict("records") == [
+        {"Protein": "rpoB", "Position": 2, "Reference": "S", "-": 0, "L": 0, "P": 2},
+        {"Protein": "rpoB", "Position": 5, "Reference": "A", "-": 0, "L": 1, "P": 0},
+        {"Protein": "rpoB", "Position": 6, "Reference": "L", "-": 1, "L": 0, "P": 0},
+    ]
+    assert frames["Position Frequencies"].to_dict("records") == [
+        {"Protein": "rpoB", "Position": 2, "Reference": "S", "-": 0, "L": 0, "P": 0.5},
+        {"Protein": "rpoB", "Position": 5, "Reference": "A", "-": 0, "L": 0.25, "P": 0},
+        {"Protein": "rpoB", "Position": 6, "Reference": "L", "-": 0.25, "L": 0, "P": 0},
+    ]
+
+
+@pytest.mark.parametrize("isolate_seq, ref_seq, expected", [
+    # Lowercase residues are compared as they are
+    ("mSTv", "MSTV", "M1m;V4v"),
+    # A gap in the isolate or in the reference is a mutation
+    ("MS-V", "MSTV", "T3-"),
+    ("MSTV", "MS-V", "-3T"),
+    # A missing isolate residue is never a mutation, a missing reference residue is
+    ("MXTV", "MSTV", "X"),
+    ("MSTV", "MSXV", "X3T"),
+    # Positions past the end of a shorter isolate are missing
+    ("MP", "MSTV", "S2P"),
+])
+def test_mutation_rules(tmp_path, isolate_seq, ref_seq, expected):
+    alignments = {"rpoB": f">H37Rv\n{ref_seq}\n>iso1\n{isolate_seq}\n"}
+    mutation_finder, sheet = find_mutations(tmp_path, alignments)
+
+    assert sheet.cell(row=2, column=2).value == expected
+    top_mutations = mutation_finder.summary_frames()["Top Mutations"]
+    expected_mutations = [] if expected == "X" else expected.split(";")
+    assert sorted(top_mutations["Mutation"]) == sorted(expected_mutations)
+
+
+def test_longer_isolate_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        find_mutations(tmp_path, {"rpoB": ">H37Rv\nMS\n>iso1\nMST\n"})
+
+
+def test_summary_without_mutations(tmp_path):
+    mutation_finder, _ = find_mutations(tmp_path, {"katG": ALIGNMENTS["katG"]})
+    frames = mutation_finder.summary_frames()
+
+    assert frames["Protein Summary"].to_dict("records") == [{
+        "Protein": "katG",
+        "Isolates": 2,
+        "Mutated Isolates": 0,
+        "Wild-type Isolates": 2,
+        "Wild-type Share": 1.0,
+    }]
+    assert frames["Position Counts"].empty
+    assert frames["Position Frequencies"].empty
+    assert frames["Top Mutations"].empty
+
+
+def test_top_n_limits_mutations(tmp_path):
+    mutation_finder, _ = find_mutations(tmp_path, ALIGNMENTS)
+    top_mutations = mutation_finder.summary_frames(top_n=1)["Top Mutations"]
+
+    assert top_mutations.to_dict("records") == [
+        {"Protein": "rpoB", "Mutation": "S2P", "Count": 2, "Frequency": 0.5},
+    ]
@@ -33,6 +33,19 @@ class ParseWithErrors(argparse.ArgumentParser):
         else:
             return arg
 
+    @staticmethod
+    def is_positive_int(parser, arg):
+        """
+        Check if the argument being parsed is an integer of at least 1
+        @param parser: an argument parser object
+        @param arg: the argument (number) being supplied
+        @return: int(arg)
+        """
+        if not arg.isdigit() or int(arg) < 1:
+            parser.error(f'"{arg}" is not a positive integer!')
+        else:
+            return int(arg)
+
 def argparser():
     """
     Parse argument from command line
@@ -48,8 +61,16 @@ def argparser():
                         type=lambda x: parser.directory_exists(parser, x))
     parser.add_argument("-e", "--extension", required=False, default=".mfa",
                         help="the multi fasta file extension [Optional] [Default: \".mfa\"]")
-    parser.add_argument("-o", "--output_excel_file", required=True,
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("-o", "--output_excel_file",
                         help="output fasta file name WITHOUT extension")
+    output.add_argument("-j", "--jsonl_output",
+                        help="stream one JSON line per isolate and protein to this file, or \"-\" for stdout, "
+                             "instead of writing the Excel sheet")
+    parser.add_argument("-n", "--top_n", required=False, default=20,
+                        type=lambda x: parser.is_positive_int(parser, x),
+                        help="number of most frequent mutations in the summary sheet, "
+                             "not used with -j [Optional] [Default: 20]")
 
     return parser
 
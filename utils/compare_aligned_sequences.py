@@ -3,10 +3,14 @@
     mutations.
     """
 
+import json
 import os
 import sys
 from collections import OrderedDict
+from typing import TextIO
 
+import numpy as np
+import pandas as pd
 from Bio import SeqIO
 from openpyxl.workbook.child import _WorkbookChild
 
@@ -15,30 +19,42 @@ class MultiFastaMutationsFinder:
     """Creates blueprint for handling Multi Fasta Alignment files and extracting
     mutations is any from comparison with a reference sequence and writing them to
     an Excel sheet.
+
+    Every comparison result is passed to on_result(). By default it is kept in
+    id_mutations for the Excel sheet. When a stream is given, it is written to the
+    stream as a JSON line instead and nothing is kept, so the Excel methods and
+    summary_frames() cannot be used.
     """
 
     def __init__(
         self,
         path: str,
-        sheet: _WorkbookChild,
+        sheet: _WorkbookChild | None,
         protein_names: list,
         extension: str,
+        stream: TextIO | None = None,
     ) -> None:
         """Constructor
 
         Args:
             path (str): Path to alignment data
-            sheet (_Workbook child): An OpenpyXL Workbook child
+            sheet (_Workbook child): An OpenpyXL Workbook child, None when streaming
             protein_names (list): A list of the protein names extracted from the file basename
             extension (str): The extension of the protein name files
+            stream (TextIO, optional): A text stream to write each result to as a JSON line
+            as soon as it is produced, instead of keeping it for the Excel sheet
         """
         self.path = path
         self.sheet = sheet
         self.ref_ids = ["H37Rv", "CDC1551", "F11", "H37Ra", "Erdman", "HN878", "KZN 1435"]
         self.protein_names = protein_names
         self.extension = extension
+        self.stream = stream
+        self.on_result = self.add_result if stream is None else self.emit_result
         self.id_mutations = OrderedDict()
         self.existing_ids = {}
+        self.protein_stats = []
+        self.mutation_counts = []
 
     def process_fasta_file(self) -> None:
         """Process the Multi Fasta Alignment file. Parse it using BioPython's
@@ -74,69 +90,191 @@ class MultiFastaMutationsFinder:
                     if not ref_seq:
                         print("Invalid Reference ID. Please try again or type 'exit' to quit.")
             else:
-                for record_id, record_seq in id_sequences_dict.items():
-                    self.handle_protein_ids(protein, record_id, record_seq, ref_seq)
+                isolate_ids = [
+                    record_id for record_id in id_sequences_dict if record_id not in self.ref_ids
+                ]
+                self.compare_aligned_sequences(
+                    protein,
+                    isolate_ids,
+                    [id_sequences_dict[record_id] for record_id in isolate_ids],
+                    ref_seq,
+                )
 
         print("Done!")
 
-    def handle_protein_ids(self, protein, record_id, record_seq, ref_seq) -> None:
-        """
-        Check if protein exits in mutation dictionary, if yes, proceed to
-        compare aligned sequences for mutation else set protein as the key with
-        a list of mutation(s) as values, if they do exist.
+    @staticmethod
+    def mutation_matrix(isolate_seqs: list, ref_seq: str) -> tuple:
+        """Stack the isolate sequences into a single character matrix
+        (isolates x positions) and compare it to the reference in one go.
+        A position is mutated if it is neither missing ("X") nor equal to the reference.
+        Isolate sequences shorter than the reference are padded with "X",
+        so their missing positions are never reported as mutations.
 
         Args:
-            protein (str): The protein name
-            record_id (str): The protein ID
-            record_seq (str): The protein sequence
-            ref_seq (str): The reference sequence
-        @return: None
+            isolate_seqs (list): The sequences of the isolates (reference excluded)
+            ref_seq (str): The sequence of the protein in the reference genome
+        @return: tuple of the reference, isolates and mutated positions arrays
         """
-        # Handle existing ID
-        if (protein in self.id_mutations) and (
-                record_id not in self.ref_ids
-        ):
-            self.compare_aligned_sequences(
-                protein, record_id, record_seq, ref_seq
-            )
-        elif record_id not in self.ref_ids:
-            self.id_mutations[protein] = []
-            self.compare_aligned_sequences(
-                protein, record_id, record_seq, ref_seq
-            )
+        ref_length = len(ref_seq)
+        if any(len(seq) > ref_length for seq in isolate_seqs):
+            raise ValueError("Isolate sequences must not be longer than the reference sequence")
+
+        ref = np.frombuffer(str(ref_seq).encode("utf-32-le"), dtype="<U1")
+        isolates = np.frombuffer(
+            "".join(str(seq).ljust(ref_length, "X") for seq in isolate_seqs).encode("utf-32-le"),
+            dtype="<U1",
+        ).reshape(len(isolate_seqs), ref_length)
+
+        mutated = (isolates != ref) & (isolates != "X")
+        return ref, isolates, mutated
 
     def compare_aligned_sequences(
-        self, protein: str, record_id: str, isolate_seq: str, ref_seq: str
+        self, protein: str, record_ids: list, isolate_seqs: list, ref_seq: str
     ) -> None:
         """Compare aligned sequences to a reference sequence.
         If the isolate's sequence is an "X" or matches that in the reference sequence, then write "X", else, write
         the mutation that occurs, like so, original nucleotide in reference first, then
         position where mutation occurs, then mutated nucleotide in isolate.
-        Mutations are stored in a dictionary as a tuple with their ID, in a list, whose
-        key is the protein for which they code for.
+        Each isolate's mutations are passed to on_result() with its ID and the protein
+        for which they code for.
+        The same mutated positions are tallied for the summary statistics.
 
         Args:
             protein (str): The protein in question.
             Gotten from file name
-            record_id (str): The ID of the isolate sequence
-            isolate_seq (str): The nucleotides that make the protein (gene) in question
+            record_ids (list): The IDs of the isolate sequences
+            isolate_seqs (list): The nucleotides that make the protein (gene) in question, per isolate
             ref_seq (str): The nucleotides that make the protein in question but in the reference genome
         """
-        mutations_list = []
-        for i, _ in enumerate(isolate_seq):
-            if isolate_seq[i] == "X" or (
-                isolate_seq[i] == ref_seq[i]
-            ):  # Check if ID was missing in previous files
-                mutations_list.append("X")
-            elif isolate_seq[i] != ref_seq[i]:
-                mutations_list.append(f"{ref_seq[i]}{i+1}{isolate_seq[i]}")
-
-        # Check if the mutation list is not full of X's, then join them by ";"
-        mutations = ";".join(filter(lambda x: x != "X", mutations_list))
-        if mutations:
-            self.id_mutations[protein].append((record_id, mutations))  # Add mutations
+        if not record_ids:
+            return
+
+        ref, isolates, mutated = self.mutation_matrix(isolate_seqs, ref_seq)
+        for row, record_id in enumerate(record_ids):
+            # Join the mutations by ";", if there are any
+            mutations = ";".join(
+                f"{ref[i]}{i + 1}{isolates[row, i]}" for i in np.flatnonzero(mutated[row])
+            )
+            self.on_result(protein, record_id, mutations)
+
+        # Summary statistics are only written to the workbook,
+        # which is never built when streaming
+        if self.stream is None:
+            self.tally_mutations(protein, ref, isolates, mutated)
+
+    def add_result(self, protein: str, record_id: str, mutations: str) -> None:
+        """Store the result of an isolate's comparison in the mutation dictionary,
+        with an "X" if the isolate has no mutations.
+
+        Args:
+            protein (str): The protein in question.
+            record_id (str): The ID of the isolate sequence
+            mutations (str): The isolate's mutations joined by ";", empty if none
+        @return: None
+        """
+        self.id_mutations.setdefault(protein, []).append((record_id, mutations or "X"))
+
+    def emit_result(self, protein: str, record_id: str, mutations: str) -> None:
+        """Write the result of an isolate's comparison to the stream as a
+        single JSON line and flush it, so consumers can read it right away.
+
+        Args:
+            protein (str): The protein in question.
+            record_id (str): The ID of the isolate sequence
+            mutations (str): The isolate's mutations joined by ";", empty if none
+        @return: None
+        """
+        result = {
+            "isolate_id": record_id,
+            "protein": protein,
+            "mutations": mutations.split(";") if mutations else [],
+        }
+        self.stream.write(json.dumps(result) + "\n")
+        self.stream.flush()
+
+    def tally_mutations(self, protein: str, ref: np.ndarray, isolates: np.ndarray, mutated: np.ndarray) -> None:
+        """Count mutations across all isolates of a protein at once from the
+        character matrix built by mutation_matrix(), so the cohort-level
+        aggregates do not have to be recovered later by splitting the mutation
+        strings in every cell.
+
+        Args:
+            protein (str): The protein in question.
+            ref (ndarray): The reference sequence's characters
+            isolates (ndarray): The isolates' characters (isolates x positions)
+            mutated (ndarray): Whether each isolate's position is mutated
+        @return: None
+        """
+        isolate_count = len(isolates)
+        mutated_isolates = int(mutated.any(axis=1).sum())
+        self.protein_stats.append({
+            "Protein": protein,
+            "Isolates": isolate_count,
+            "Mutated Isolates": mutated_isolates,
+            "Wild-type Isolates": isolate_count - mutated_isolates,
+            "Wild-type Share": (isolate_count - mutated_isolates) / isolate_count,
+        })
+
+        rows, positions = np.nonzero(mutated)
+        if not positions.size:
+            return
+
+        counts = (
+            pd.DataFrame({
+                "Protein": protein,
+                "Position": positions + 1,
+                "Reference": ref[positions],
+                "Alt": isolates[rows, positions],
+            })
+            .groupby(["Protein", "Position", "Reference", "Alt"])
+            .size()
+            .reset_index(name="Count")
+        )
+        counts["Frequency"] = counts["Count"] / isolate_count
+        self.mutation_counts.append(counts)
+
+    def summary_frames(self, top_n: int = 20) -> OrderedDict:
+        """Build the cohort-level summary tables from the tallied mutations.
+
+        Args:
+            top_n (int, optional): Number of most frequent mutations to keep.
+            Default to 20.
+        @return: OrderedDict of sheet names and their DataFrames
+        """
+        protein_summary = pd.DataFrame(
+            self.protein_stats,
+            columns=["Protein", "Isolates", "Mutated Isolates", "Wild-type Isolates", "Wild-type Share"],
+        )
+
+        if self.mutation_counts:
+            counts = pd.concat(self.mutation_counts, ignore_index=True)
         else:
-            self.id_mutations[protein].append((record_id, "X"))
+            counts = pd.DataFrame(columns=["Protein", "Position", "Reference", "Alt", "Count", "Frequency"])
+
+        position_counts, position_frequencies = (
+            counts.pivot_table(
+                index=["Protein", "Position", "Reference"],
+                columns="Alt",
+                values=values,
+                aggfunc="sum",
+                fill_value=0,
+            )
+            .reset_index()
+            .rename_axis(columns=None)
+            for values in ("Count", "Frequency")
+        )
+
+        top_mutations = counts.assign(
+            Mutation=counts["Reference"] + counts["Position"].astype(str) + counts["Alt"]
+        ).sort_values(["Count", "Protein", "Position"], ascending=[False, True, True])
+        top_mutations = top_mutations[["Protein", "Mutation", "Count", "Frequency"]].head(top_n)
+
+        return OrderedDict([
+            ("Protein Summary", protein_summary),
+            ("Position Counts", position_counts),
+            ("Position Frequencies", position_frequencies),
+            ("Top Mutations", top_mutations.reset_index(drop=True)),
+        ])
 
     def get_mutations(self):
         """Prints out all mutations.
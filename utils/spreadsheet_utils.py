@@ -93,6 +93,33 @@ def insert_data_to_specific_row():
             value  # Adjust column number as needed
         )
 
+
+def insert_dataframe_to_sheet(workbook: Workbook, title: str, df: pd.DataFrame):
+    """Write a DataFrame, headers included, to a new sheet in the workbook
+
+    Args:
+        workbook (Workbook): Workbook object to add the sheet to
+        title (str): Title of the new sheet
+        df (DataFrame): The data to write to the sheet
+    """
+    sheet = workbook.create_sheet(title=title)
+    insert_headers_to_excel(list(df.columns), sheet)
+    for row in df.itertuples(index=False):
+        sheet.append(list(row))
+
+
+def dataframe_to_csv(df: pd.DataFrame, base_filename: str, title: str):
+    """Save a DataFrame to a csv file named after the output file and sheet title
+
+    Args:
+        df (DataFrame): The data to save
+        base_filename (str): Name of the output file WITHOUT extension
+        title (str): Title of the sheet, used as the csv file name suffix
+    """
+    csv_file = f"{base_filename}_{title.lower().replace(' ', '_')}.csv"
+    df.to_csv(csv_file, index=False)
+
+
 def excel_to_csv(excel_file, sheet_name):
     df = pd.read_excel(excel_file, sheet_name=sheet_name)
     base_filename = os.path.splitext(excel_file)[0]